@@ -0,0 +1,97 @@
+from django.conf import settings
+from typing import Callable, Optional, Union
+
+
+class AIProvider:
+    """
+    Interface for text generation backends used by ai_utils
+
+    Providers must be cheap to construct; any SDK import or network setup
+    belongs in the first call to generate().
+    """
+    name = 'base'
+
+    def generate(self, prompt: str) -> str:
+        """Return the raw text the model produced for the prompt"""
+        raise NotImplementedError
+
+
+class GeminiProvider(AIProvider):
+    """Google Gemini, with the SDK imported and configured on first use"""
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model_name: str = 'gemini-pro'):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+
+    def _get_model(self):
+        if self._model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+            print("Gemini API configured successfully")
+        return self._model
+
+    def generate(self, prompt: str) -> str:
+        response = self._get_model().generate_content(prompt)
+        return response.text
+
+
+class StubProvider(AIProvider):
+    """
+    Offline provider returning a canned response
+
+    Args:
+        response: Text to return, or a callable taking the prompt
+    """
+    name = 'stub'
+
+    def __init__(self, response: Union[str, Callable[[str], str]] = '{"confidence": 0}'):
+        self.response = response
+
+    def generate(self, prompt: str) -> str:
+        if callable(self.response):
+            return self.response(prompt)
+        return self.response
+
+
+_provider: Optional[AIProvider] = None
+_provider_loaded = False
+
+
+def get_provider() -> Optional[AIProvider]:
+    """
+    The configured AI provider, or None when AI is not available
+
+    Chosen by settings.AI_PROVIDER ('gemini' or 'stub') and built once per
+    process.
+    """
+    global _provider, _provider_loaded
+
+    if not _provider_loaded:
+        if settings.AI_PROVIDER == 'stub':
+            _provider = StubProvider()
+        elif settings.AI_PROVIDER == 'gemini' and settings.GEMINI_API_KEY:
+            _provider = GeminiProvider(settings.GEMINI_API_KEY)
+        else:
+            print(f"Warning: no usable AI provider for AI_PROVIDER='{settings.AI_PROVIDER}'")
+            _provider = None
+        _provider_loaded = True
+
+    return _provider
+
+
+def set_provider(provider: Optional[AIProvider]) -> None:
+    """Swap the active provider, e.g. for a StubProvider in tests"""
+    global _provider, _provider_loaded
+    _provider = provider
+    _provider_loaded = True
+
+
+def reset_provider() -> None:
+    """Forget the active provider so the next call rebuilds it from settings"""
+    global _provider, _provider_loaded
+    _provider = None
+    _provider_loaded = False
@@ -1,43 +1,62 @@
-import google.generativeai as genai
 import json
 from datetime import datetime, timedelta
-from django.conf import settings
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import traceback
+from ai_providers import get_provider
 
-# Configure Gemini API
-try:
-    if settings.GEMINI_API_KEY:
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        print("Gemini API configured successfully")
-    else:
-        print("Warning: GEMINI_API_KEY not found in settings")
-except Exception as e:
-    print(f"Error configuring Gemini API: {e}")
+# A past task this similar is trusted to predict category and priority
+# without asking the model
+LOCAL_PREDICTION_SIMILARITY = 0.8
 
-def get_ai_task_suggestions(title: str, context: str = "") -> Dict[str, Any]:
+def format_examples(examples: List[Dict[str, Any]]) -> str:
     """
-    Get AI-powered task suggestions using Google Gemini
+    Render similar past tasks as few-shot examples for a prompt
+    """
+    lines = []
+    for example in examples:
+        line = (
+            f"- \"{example['title']}\" -> category: {example['category'].lower()}, "
+            f"priority: {example['priority']}, status: {example['status']}"
+        )
+        if example.get('days_to_complete') is not None:
+            line += f", completed in {example['days_to_complete']} days"
+        lines.append(line)
+    return "\n    ".join(lines)
+
+def get_ai_task_suggestions(title: str, context: str = "",
+                            examples: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Get AI-powered task suggestions from the configured AI provider
     
     Args:
         title: The task title
         context: Additional context for the task
+        examples: The user's most similar past tasks, best match first
     
     Returns:
         Dictionary containing AI suggestions
     """
     print(f"Getting AI suggestions for title: '{title}', context: '{context}'")
+    examples = examples or []
     
-    if not settings.GEMINI_API_KEY:
-        print("No Gemini API key found, returning default suggestions")
-        return get_default_suggestions(title)
+    provider = get_provider()
+    if provider is None:
+        print("No AI provider available, returning default suggestions")
+        return get_default_suggestions(title, examples)
+    
+    history = ""
+    if examples:
+        history = f"""
+    Similar tasks this user has had before (use them to match their categories and priorities):
+    {format_examples(examples)}
+    """
     
     prompt = f"""
     You are a smart task management assistant. Analyze the following task and provide suggestions:
     
     Task: {title}
     Context: {context}
-    
+    {history}
     Please provide a JSON response with:
     - improved_description: A more detailed and clear description (max 200 chars)
     - priority_score: A number from 0-100 indicating priority
@@ -49,13 +68,12 @@ def get_ai_task_suggestions(title: str, context: str = "") -> Dict[str, Any]:
     """
 
     try:
-        model = genai.GenerativeModel('gemini-pro')
-        response = model.generate_content(prompt)
+        response_text = provider.generate(prompt)
         
-        print(f"Gemini API response: {response.text}")
+        print(f"{provider.name} API response: {response_text}")
         
         # Clean the response text
-        ai_response = response.text.strip()
+        ai_response = response_text.strip()
         
         # Remove markdown code blocks if present
         if ai_response.startswith('```json'):
@@ -81,15 +99,18 @@ def get_ai_task_suggestions(title: str, context: str = "") -> Dict[str, Any]:
         return result
         
     except Exception as e:
-        print(f"Gemini AI suggestion error: {e}")
+        print(f"AI suggestion error: {e}")
         traceback.print_exc()
-        return get_default_suggestions(title)
+        return get_default_suggestions(title, examples)
 
-def get_default_suggestions(title: str) -> Dict[str, Any]:
+def get_default_suggestions(title: str,
+                            examples: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
     Provide default suggestions when AI is not available
+
+    A close enough past task supplies the category and priority.
     """
-    return {
+    suggestions = {
         'improved_description': f"Complete the task: {title}",
         'priority_score': 50,
         'suggested_deadline': (datetime.now() + timedelta(days=7)).isoformat(),
@@ -97,9 +118,20 @@ def get_default_suggestions(title: str) -> Dict[str, Any]:
         'confidence': 0
     }
 
+    if examples and examples[0]['similarity'] >= LOCAL_PREDICTION_SIMILARITY:
+        closest = examples[0]
+        suggestions['priority_score'] = closest['priority']
+        suggestions['suggested_category'] = closest['category'].lower() or 'personal'
+        suggestions['confidence'] = round(closest['similarity'] * 100)
+        if closest.get('days_to_complete') is not None:
+            days = max(1, round(closest['days_to_complete']))
+            suggestions['suggested_deadline'] = (datetime.now() + timedelta(days=days)).isoformat()
+
+    return suggestions
+
 def process_context_for_tasks(content: str, content_type: str) -> Dict[str, Any]:
     """
-    Process context content to extract actionable tasks using Gemini
+    Process context content to extract actionable tasks with the configured AI provider
     
     Args:
         content: The context content (email, note, message)
@@ -110,8 +142,9 @@ def process_context_for_tasks(content: str, content_type: str) -> Dict[str, Any]
     """
     print(f"Processing context: type='{content_type}', content length={len(content)}")
     
-    if not settings.GEMINI_API_KEY:
-        print("No Gemini API key found, returning default context processing")
+    provider = get_provider()
+    if provider is None:
+        print("No AI provider available, returning default context processing")
         return get_default_context_processing(content, content_type)
     
     prompt = f"""
@@ -132,13 +165,12 @@ def process_context_for_tasks(content: str, content_type: str) -> Dict[str, Any]
     """
 
     try:
-        model = genai.GenerativeModel('gemini-pro')
-        response = model.generate_content(prompt)
+        response_text = provider.generate(prompt)
         
-        print(f"Gemini context processing response: {response.text}")
+        print(f"{provider.name} context processing response: {response_text}")
         
         # Clean the response text
-        ai_response = response.text.strip()
+        ai_response = response_text.strip()
         
         # Remove markdown code blocks if present
         if ai_response.startswith('```json'):
@@ -170,7 +202,7 @@ def process_context_for_tasks(content: str, content_type: str) -> Dict[str, Any]
         return final_result
         
     except Exception as e:
-        print(f"Gemini context processing error: {e}")
+        print(f"AI context processing error: {e}")
         traceback.print_exc()
         return get_default_context_processing(content, content_type)
 
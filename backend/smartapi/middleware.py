@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db import connections
+from .routers import use_replica, REPLICA_ALIAS
+
+# Read-only endpoints that are safe to serve from a replica
+REPLICA_VIEWS = {'task-stats'}
+
+
+def classify_request(request):
+    """
+    Request class used to pick a statement timeout and database
+
+    Returns:
+        One of 'list', 'export', 'read' or 'write'
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return 'write'
+
+    url_name = request.resolver_match.url_name if request.resolver_match else ''
+    if url_name == 'task-export':
+        return 'export'
+    if url_name.endswith('-list') or url_name in REPLICA_VIEWS:
+        return 'list'
+    return 'read'
+
+
+def set_statement_timeout(alias, timeout):
+    """
+    Apply a PostgreSQL statement timeout (ms, 0 for none) to a connection
+
+    The value sticks to persistent connections, so the SET is only sent
+    when it differs from what the connection already has.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql' or settings.DB_PGBOUNCER:
+        return
+
+    connection.ensure_connection()
+    state = (id(connection.connection), timeout)
+    if getattr(connection, 'statement_timeout_state', None) == state:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute('SET statement_timeout = %s', [timeout])
+    connection.statement_timeout_state = state
+
+
+class DatabaseRequestMiddleware:
+    """
+    Route list reads to the replica and set per-request statement timeouts
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            token = getattr(request, 'use_replica_token', None)
+            if token is not None:
+                use_replica.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request_class = classify_request(request)
+        # default serves writes and primary-only reads even on replica
+        # requests, and keeps whatever timeout the last request set
+        aliases = ['default']
+
+        if request_class == 'list' and REPLICA_ALIAS in settings.DATABASES:
+            request.use_replica_token = use_replica.set(True)
+            aliases.append(REPLICA_ALIAS)
+
+        timeout = settings.DB_STATEMENT_TIMEOUTS.get(request_class)
+        if timeout is not None:
+            for alias in aliases:
+                set_statement_timeout(alias, timeout)
+        return None
@@ -0,0 +1,29 @@
+from contextvars import ContextVar
+from django.conf import settings
+
+# Set by DatabaseRequestMiddleware for requests that may read from a replica
+use_replica = ContextVar('use_replica', default=False)
+
+REPLICA_ALIAS = 'replica'
+
+
+class ReadReplicaRouter:
+    """
+    Send reads to the replica during list and stats requests
+
+    Everything else, including all writes and migrations, stays on default.
+    """
+    def db_for_read(self, model, **hints):
+        if use_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
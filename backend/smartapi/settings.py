@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 from decouple import config
-import dj_database_url
+from .database import build_database
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -36,6 +36,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'smartapi.middleware.DatabaseRequestMiddleware',
 ]
 
 ROOT_URLCONF = 'smartapi.urls'
@@ -59,12 +60,60 @@ TEMPLATES = [
 WSGI_APPLICATION = 'smartapi.wsgi.application'
 
 # Database
+# Connections are kept open for DB_CONN_MAX_AGE seconds and health checked
+# before reuse. Set DB_PGBOUNCER when connecting through PgBouncer in
+# transaction mode, or DB_POOL for Django's built-in pool (Django 5.1+).
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+
+# PostgreSQL statement timeouts in milliseconds (0 disables the limit), set
+# per request by DatabaseRequestMiddleware. Management commands such as
+# migrate and recompute_priorities run without one.
+DB_STATEMENT_TIMEOUT = config('DB_STATEMENT_TIMEOUT', default=10000, cast=int)
+DB_STATEMENT_TIMEOUTS = {
+    'list': config('DB_LIST_STATEMENT_TIMEOUT', default=2000, cast=int),
+    'read': config('DB_READ_STATEMENT_TIMEOUT', default=5000, cast=int),
+    'write': DB_STATEMENT_TIMEOUT,
+    'export': config('DB_EXPORT_STATEMENT_TIMEOUT', default=0, cast=int),
+}
+
+DATABASE_OPTIONS = {
+    'conn_max_age': DB_CONN_MAX_AGE,
+    'health_checks': True,
+    'pgbouncer': DB_PGBOUNCER,
+    'pool': DB_POOL,
+    'pool_min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+    'pool_max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+}
+
 DATABASES = {
-    'default': dj_database_url.config(
-        default=config('DATABASE_URL', default='sqlite:///db.sqlite3')
+    'default': build_database(
+        config('DATABASE_URL', default='sqlite:///db.sqlite3'),
+        **DATABASE_OPTIONS
     )
 }
 
+# Optional read replica for list and stats requests
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = build_database(DATABASE_REPLICA_URL, **DATABASE_OPTIONS)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['smartapi.routers.ReadReplicaRouter']
+
+# Cache
+# Use a shared backend (e.g. redis or memcached) when running several processes
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='smart-todo'),
+    }
+}
+
+# Seconds a user's cached categories are kept before being rebuilt
+CATEGORY_CACHE_TIMEOUT = config('CATEGORY_CACHE_TIMEOUT', default=300, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -118,6 +167,9 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
 
+# AI provider: 'gemini' or 'stub' (offline canned responses)
+AI_PROVIDER = config('AI_PROVIDER', default='gemini')
+
 # Gemini Configuration
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 
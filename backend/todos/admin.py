@@ -1,25 +1,209 @@
+import json
 from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Length, Substr
+from django.utils.functional import cached_property
 from .models import Task, Category, ContextEntry
 
+# Below this many rows an exact COUNT(*) is cheap enough to keep
+ESTIMATED_COUNT_THRESHOLD = 100000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's row estimate on large changelists
+
+    Only applies on PostgreSQL. Unfiltered changelists use the table's
+    reltuples; filtered or searched ones use the row estimate from EXPLAIN.
+    Estimates below ESTIMATED_COUNT_THRESHOLD are replaced by an exact
+    count, which is cheap at that size.
+    """
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None:
+            connection = connections[self.object_list.db]
+            if connection.vendor == 'postgresql':
+                estimate = self._estimate(connection, query)
+                if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                    return estimate
+        return super().count
+
+    def _estimate(self, connection, query):
+        with connection.cursor() as cursor:
+            if not query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+                return row[0] if row else None
+
+            sql, params = query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']['Plan Rows']
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    List filter with a text box, so related objects are never enumerated
+    """
+    template = 'admin/todos/input_filter.html'
+    placeholder = ''
+
+    def lookups(self, request, model_admin):
+        # A non-empty lookup list is required for the filter to render
+        return ((None, None),)
+
+    def choices(self, changelist):
+        all_choice = next(super().choices(changelist))
+        all_choice['query_parts'] = [
+            (key, value) for key, value in changelist.params.items()
+            if key not in (self.parameter_name, 'p')
+        ]
+        yield all_choice
+
+
+class UsernameFilter(InputFilter):
+    title = 'user'
+    parameter_name = 'username'
+    placeholder = 'Exact username'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user__username=self.value().strip())
+
+
+class CategoryNameFilter(InputFilter):
+    title = 'category'
+    parameter_name = 'category_name'
+    placeholder = 'Exact category name'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(category__name__iexact=self.value().strip())
+
+
+class PriorityLevelFilter(admin.SimpleListFilter):
+    """Priority buckets matching Task.priority_label, without a DISTINCT scan"""
+    title = 'priority'
+    parameter_name = 'priority_level'
+
+    def lookups(self, request, model_admin):
+        return [('high', 'High'), ('medium', 'Medium'), ('low', 'Low')]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'high':
+            return queryset.filter(priority__gte=80)
+        if self.value() == 'medium':
+            return queryset.filter(priority__gte=60, priority__lt=80)
+        if self.value() == 'low':
+            return queryset.filter(priority__lt=60)
+
+
+class IndexedSearchMixin:
+    """
+    Changelist search limited to lookups that an index can serve
+
+    Django's default search compiles to UPPER(col) LIKE UPPER('%term%'),
+    which no index can serve. Instead:
+
+    - On PostgreSQL, the text columns in ``search_fields`` are matched with
+      full-text search against the GIN index from todos.search, so words
+      match anywhere in the text, case-insensitively and stemmed
+    - Elsewhere, the columns in ``prefix_search_fields`` are matched as a
+      case-sensitive prefix (``title LIKE 'term%'``), which a plain btree
+      index serves
+    - ``user__username`` in ``search_fields`` matches an exact username,
+      resolved once through auth_user's unique index and then matched on the
+      indexed ``user_id`` foreign key
+    """
+    prefix_search_fields = []
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        conditions = []
+        if 'user__username' in self.search_fields:
+            user_id = User.objects.filter(username=search_term).values_list('id', flat=True).first()
+            if user_id is not None:
+                conditions.append(Q(user_id=user_id))
+
+        if connections[queryset.db].vendor == 'postgresql':
+            # Imported here since django.contrib.postgres needs psycopg
+            from .search import search_query, search_vector
+
+            queryset = queryset.alias(search=search_vector(self.model))
+            conditions.append(Q(search=search_query(search_term)))
+        else:
+            conditions.extend(
+                Q(**{f'{field}__startswith': search_term})
+                for field in self.prefix_search_fields
+            )
+
+        if not conditions:
+            return queryset.none(), False
+        condition = conditions[0]
+        for other in conditions[1:]:
+            condition |= other
+        return queryset.filter(condition), False
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'color', 'icon', 'user', 'created_at']
-    list_filter = ['user', 'created_at']
+    list_filter = [UsernameFilter, 'created_at']
+    list_select_related = ['user']
     search_fields = ['name', 'user__username']
+    autocomplete_fields = ['user']
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'priority', 'status', 'category', 'user', 'due_date', 'ai_suggested', 'created_at']
-    list_filter = ['status', 'priority', 'ai_suggested', 'category', 'user', 'created_at']
+    list_filter = ['status', PriorityLevelFilter, 'ai_suggested', CategoryNameFilter, UsernameFilter, 'created_at']
+    list_select_related = ['category', 'category__user', 'user']
+    # Searched through IndexedSearchMixin, see its docstring. Text fields
+    # must match todos.search.SEARCH_FIELDS
     search_fields = ['title', 'description', 'user__username']
-    date_hierarchy = 'created_at'
+    prefix_search_fields = ['title']
+    search_help_text = 'Words in the title or description (title prefix on SQLite), or an exact username'
+    autocomplete_fields = ['category', 'user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(ContextEntry)
-class ContextEntryAdmin(admin.ModelAdmin):
+class ContextEntryAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['type', 'content_preview', 'processed', 'user', 'created_at']
-    list_filter = ['type', 'processed', 'user', 'created_at']
+    list_filter = ['type', 'processed', UsernameFilter, 'created_at']
+    list_select_related = ['user']
+    # Searched through IndexedSearchMixin, see its docstring. Text fields
+    # must match todos.search.SEARCH_FIELDS
     search_fields = ['content', 'user__username']
+    search_help_text = 'Words in the content (PostgreSQL only), or an exact username'
+    autocomplete_fields = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            # Only the first 100 characters are needed for the list
+            queryset = queryset.annotate(
+                content_head=Substr('content', 1, 100),
+                content_length=Length('content')
+            ).defer('content')
+        return queryset
 
     def content_preview(self, obj):
+        if hasattr(obj, 'content_head'):
+            return obj.content_head + '...' if obj.content_length > 100 else obj.content_head
         return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
-    content_preview.short_description = 'Content Preview'
\ No newline at end of file
+    content_preview.short_description = 'Content Preview'
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class TodosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'todos'
\ No newline at end of file
+    name = 'todos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
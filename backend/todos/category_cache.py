@@ -0,0 +1,109 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from .models import Category
+from .serializers import CategorySerializer
+
+
+# Entries are cached under the version current when they were read, so they
+# are always filled from the primary: a lagging replica would otherwise store
+# stale rows under a version that is never bumped again.
+
+
+def _version_key(user_id, name):
+    return f'categories:{user_id}:{name}:version'
+
+
+def _data_key(user_id, version, name):
+    return f'categories:{user_id}:v{version}:{name}'
+
+
+def get_version(user_id, name):
+    """
+    Current cache version of one of a user's category entries
+
+    The name map and the list payload are versioned separately, since task
+    writes only affect the task counts in the list. Versions are seeded from
+    the clock so a version key that was evicted never resurrects entries
+    written under an older version.
+    """
+    key = _version_key(user_id, name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(user_id, name):
+    key = _version_key(user_id, name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def invalidate_categories(user_id):
+    """Drop every cached category entry for the user, in every process"""
+    _bump_version(user_id, 'names')
+    _bump_version(user_id, 'list')
+
+
+def invalidate_category_list(user_id):
+    """Drop only the cached list payload, whose task counts went stale"""
+    _bump_version(user_id, 'list')
+
+
+def get_category_map(user_id):
+    """
+    Map of lowercased category name to category id for a user
+    """
+    key = _data_key(user_id, get_version(user_id, 'names'), 'names')
+    category_map = cache.get(key)
+    if category_map is None:
+        category_map = {
+            name.lower(): category_id
+            for category_id, name in Category.objects.using('default').filter(
+                user_id=user_id
+            ).values_list('id', 'name')
+        }
+        cache.set(key, category_map, settings.CATEGORY_CACHE_TIMEOUT)
+    return category_map
+
+
+def resolve_category_id(user, name):
+    """
+    Find a user's category by name, creating it if it does not exist yet
+
+    Returns:
+        The category id
+    """
+    name = name.title()
+    category_id = get_category_map(user.id).get(name.lower())
+    if category_id is None:
+        category, _ = Category.objects.get_or_create(
+            user=user,
+            name=name,
+            defaults={
+                'color': '#6B7280',
+                'icon': 'folder'
+            }
+        )
+        category_id = category.id
+    return category_id
+
+
+def get_category_list(user_id):
+    """
+    Serialized category list for a user, as returned by the categories endpoint
+    """
+    key = _data_key(user_id, get_version(user_id, 'list'), 'list')
+    data = cache.get(key)
+    if data is None:
+        queryset = Category.objects.using('default').filter(user_id=user_id).annotate(
+            num_tasks=Count('tasks')
+        ).order_by('name')
+        data = list(CategorySerializer(queryset, many=True).data)
+        cache.set(key, data, settings.CATEGORY_CACHE_TIMEOUT)
+    return data
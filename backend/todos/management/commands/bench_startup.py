@@ -0,0 +1,81 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Records whether anything tries to import the AI SDK, installed or not.
+# Hooks __import__ rather than sys.meta_path, since a missing 'google'
+# package fails before the submodule is ever looked up.
+SDK_PROBE = """
+import builtins
+import sys
+
+class SdkProbe:
+    imported = False
+    original_import = builtins.__import__
+
+    @staticmethod
+    def hook(name, globals=None, locals=None, fromlist=(), level=0):
+        if name.startswith('google.generativeai') or (
+                name == 'google' and 'generativeai' in (fromlist or ())):
+            SdkProbe.imported = True
+        return SdkProbe.original_import(name, globals, locals, fromlist, level)
+
+builtins.__import__ = SdkProbe.hook
+"""
+
+WSGI_BOOT = SDK_PROBE + """
+import smartapi.wsgi
+from django.urls import get_resolver
+
+# Load the URLconf, and with it every view module, as the first request would
+get_resolver().url_patterns
+assert 'todos.views' in sys.modules
+print(SdkProbe.imported)
+"""
+
+# Each target runs in a fresh interpreter so nothing is already imported
+TARGETS = {
+    'manage.py check': [sys.executable, 'manage.py', 'check'],
+    'wsgi boot': [sys.executable, '-c', WSGI_BOOT],
+}
+
+
+class Command(BaseCommand):
+    help = "Measure cold start time of manage.py check and the WSGI application"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help='Number of fresh processes started per target'
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='smartapi.settings')
+
+        for name, command in TARGETS.items():
+            timings = []
+            output = ''
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                result = subprocess.run(
+                    command, cwd=settings.BASE_DIR, env=env,
+                    capture_output=True, text=True
+                )
+                timings.append(time.perf_counter() - started)
+                if result.returncode != 0:
+                    self.stderr.write(f"{name} failed:\n{result.stderr}")
+                    return
+                output = result.stdout
+
+            self.stdout.write(
+                f"{name}: min {min(timings) * 1000:.0f}ms, "
+                f"median {statistics.median(timings) * 1000:.0f}ms "
+                f"over {len(timings)} runs"
+            )
+            if name == 'wsgi boot':
+                loaded = output.strip().splitlines()[-1] == 'True'
+                self.stdout.write(f"  AI SDK imported at boot: {'yes' if loaded else 'no'}")
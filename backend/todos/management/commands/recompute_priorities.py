@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from todos.priority import recompute_priorities, RECOMPUTE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Recompute effective priority of open tasks from deadline proximity and age"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=RECOMPUTE_BATCH_SIZE,
+            help='Number of tasks loaded per batch'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running, recomputing every --interval seconds'
+        )
+        parser.add_argument(
+            '--interval', type=int, default=900,
+            help='Seconds between runs when --loop is given'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            scanned, updated = recompute_priorities(batch_size=options['batch_size'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"Scanned {scanned} open tasks, updated {updated} in {elapsed:.1f}s"
+            )
+
+            if not options['loop']:
+                break
+
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
+            # Drop connections that went stale while sleeping
+            close_old_connections()
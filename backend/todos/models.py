@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -23,7 +24,8 @@ class Task(models.Model):
         ('completed', 'Completed'),
     ]
 
-    title = models.CharField(max_length=200)
+    # Indexed for prefix search in the admin
+    title = models.CharField(max_length=200, db_index=True)
     description = models.TextField(blank=True)
     priority = models.IntegerField(
         default=50,
@@ -33,16 +35,35 @@ class Task(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='tasks')
     due_date = models.DateTimeField(null=True, blank=True)
     ai_suggested = models.BooleanField(default=False)
+    # Priority adjusted for deadline proximity and age, kept fresh by the
+    # recompute_priorities command
+    effective_priority = models.IntegerField(default=50, db_index=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='task_status_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.user.username})"
 
+    def save(self, *args, **kwargs):
+        from .priority import compute_effective_priority
+
+        # to_python accepts the strings and dates Django itself would save
+        due_date = self._meta.get_field('due_date').to_python(self.due_date)
+        self.effective_priority = compute_effective_priority(
+            self.priority, due_date, self.created_at, timezone.now()
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'priority', 'due_date'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'effective_priority'}
+        super().save(*args, **kwargs)
+
     @property
     def priority_label(self):
         if self.priority >= 80:
@@ -62,7 +83,7 @@ class ContextEntry(models.Model):
     type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='note')
     processed = models.BooleanField(default=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='context_entries')
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         verbose_name_plural = "Context Entries"
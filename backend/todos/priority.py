@@ -0,0 +1,96 @@
+import math
+from django.utils import timezone
+from .models import Task
+
+OPEN_STATUSES = ['pending', 'in_progress']
+
+# Boost added once a task is due or overdue; it decays as the deadline
+# moves further away
+DEADLINE_BOOST = 40
+DEADLINE_DECAY_HOURS = 48
+
+# Open tasks slowly gain priority so old ones don't starve
+AGE_BOOST_PER_DAY = 0.5
+MAX_AGE_BOOST = 15
+
+RECOMPUTE_BATCH_SIZE = 1000
+
+
+def compute_effective_priority(priority, due_date, created_at, now):
+    """
+    Effective priority from the assigned priority, deadline proximity and age
+
+    Args:
+        priority: The priority set on the task (0-100)
+        due_date: The task deadline, or None
+        created_at: When the task was created, or None for unsaved tasks
+        now: Reference time for the computation
+
+    Returns:
+        Integer priority between 0 and 100
+    """
+    score = priority
+
+    if due_date is not None:
+        # Naive datetimes are taken to be in the current time zone, as Django
+        # does when saving them
+        if timezone.is_naive(due_date):
+            due_date = timezone.make_aware(due_date)
+        hours_left = (due_date - now).total_seconds() / 3600
+        if hours_left <= 0:
+            score += DEADLINE_BOOST
+        else:
+            score += DEADLINE_BOOST * math.exp(-hours_left / DEADLINE_DECAY_HOURS)
+
+    if created_at is not None:
+        age_days = max(0.0, (now - created_at).total_seconds() / 86400)
+        score += min(MAX_AGE_BOOST, age_days * AGE_BOOST_PER_DAY)
+
+    return max(0, min(100, round(score)))
+
+
+def recompute_priorities(batch_size=RECOMPUTE_BATCH_SIZE, now=None):
+    """
+    Recompute effective priority for every open task
+
+    Tasks are walked in primary key order, one batch at a time, so memory use
+    depends on ``batch_size`` rather than on the table size. Only rows whose
+    effective priority actually changed are written back.
+
+    Returns:
+        Tuple of (tasks scanned, tasks updated)
+    """
+    now = now or timezone.now()
+    scanned = 0
+    updated = 0
+    last_id = 0
+
+    while True:
+        batch = list(
+            Task.objects.filter(status__in=OPEN_STATUSES, id__gt=last_id)
+            .order_by('id')
+            .only('id', 'priority', 'effective_priority', 'due_date', 'created_at')
+            [:batch_size]
+        )
+        if not batch:
+            break
+
+        last_id = batch[-1].id
+        scanned += len(batch)
+
+        changed = []
+        for task in batch:
+            effective = compute_effective_priority(
+                task.priority, task.due_date, task.created_at, now
+            )
+            if effective != task.effective_priority:
+                task.effective_priority = effective
+                changed.append(task)
+
+        if changed:
+            # bulk_update leaves updated_at alone, which is what we want for
+            # a derived value
+            Task.objects.bulk_update(changed, ['effective_priority'])
+            updated += len(changed)
+
+    return scanned, updated
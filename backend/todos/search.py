@@ -0,0 +1,56 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections, router
+from .models import Task, ContextEntry
+
+SEARCH_CONFIG = 'english'
+
+# Text columns covered by each model's full-text index
+SEARCH_FIELDS = {
+    Task: ['title', 'description'],
+    ContextEntry: ['content'],
+}
+
+
+def search_vector(model):
+    """
+    The tsvector expression a model is searched on
+
+    Queries must use exactly this expression for PostgreSQL to match them
+    to the GIN index built from it.
+    """
+    return SearchVector(*SEARCH_FIELDS[model], config=SEARCH_CONFIG)
+
+
+def search_query(term):
+    # websearch syntax never raises on user input, unlike to_tsquery
+    return SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search_index(model):
+    return GinIndex(search_vector(model), name=f'{model._meta.db_table}_search_idx')
+
+
+def create_search_indexes(using='default', verbosity=1):
+    """
+    Create the full-text GIN indexes on PostgreSQL if they don't exist yet
+
+    They live outside Meta.indexes because the GIN expression index can't
+    be created on SQLite, which the app also runs on.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        for model in SEARCH_FIELDS:
+            if not router.allow_migrate_model(using, model):
+                continue
+            index = search_index(model)
+            existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+            if index.name in existing:
+                continue
+            if verbosity:
+                print(f"Creating full-text index {index.name}")
+            with connection.schema_editor() as schema_editor:
+                schema_editor.add_index(model, index)
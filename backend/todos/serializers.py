@@ -16,6 +16,9 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
     def get_task_count(self, obj):
+        # Use the annotated count when the queryset provides one
+        if hasattr(obj, 'num_tasks'):
+            return obj.num_tasks
         return obj.tasks.count()
 
     def create(self, validated_data):
@@ -36,10 +39,10 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'id', 'title', 'description', 'priority', 'priority_label',
-            'status', 'category', 'category_name', 'category_color',
-            'due_date', 'ai_suggested', 'created_at', 'updated_at'
+            'effective_priority', 'status', 'category', 'category_name',
+            'category_color', 'due_date', 'ai_suggested', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['effective_priority', 'created_at', 'updated_at']
 
     def create(self, validated_data):
         # Get or create default user
@@ -50,6 +53,14 @@ class TaskSerializer(serializers.ModelSerializer):
         validated_data['user'] = user
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        # Write only the submitted columns so concurrent partial updates
+        # don't overwrite each other
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
     def validate_category(self, value):
         # For development, allow any category
         return value
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from .models import Task, Category
+from .category_cache import invalidate_categories, invalidate_category_list
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate_categories(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_changed(sender, instance, **kwargs):
+    # Cached category lists carry task counts; the name map is unaffected
+    invalidate_category_list(instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, **kwargs):
+    # Imported here so numpy is only loaded once tasks are written
+    from .similarity import task_saved as index_task
+
+    index_task(instance)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    from .similarity import task_deleted as unindex_task
+
+    unindex_task(instance)
+
+
+@receiver(post_migrate)
+def create_search_indexes(sender, using, verbosity, **kwargs):
+    if sender.name != 'todos':
+        return
+    # Imported here since django.contrib.postgres needs psycopg
+    from .search import create_search_indexes as create_indexes
+
+    create_indexes(using, verbosity)
@@ -0,0 +1,372 @@
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+from django.core.cache import cache
+from django.db import connections
+from .models import Task, Category
+
+# 256 float32 dimensions is 1 KB per indexed task
+EMBEDDING_DIM = 256
+NGRAM_SIZE = 3
+
+# Neighbours below this cosine similarity are not considered related
+MIN_SIMILARITY = 0.35
+
+# Indexes kept per process are bounded by user count and by the total rows
+# allocated across all of them (least recently used are dropped first), and
+# each holds at most the user's most recent MAX_INDEXED_TASKS tasks
+MAX_CACHED_USERS = 100
+MAX_TOTAL_ROWS = 50000
+MAX_INDEXED_TASKS = 5000
+
+# Build indexes in a thread, off the request path. Until a user's first
+# index is ready, queries return no matches; a stale index keeps serving
+# while its replacement is built.
+BUILD_IN_BACKGROUND = True
+
+MIN_CAPACITY = 64
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _hash(feature):
+    # crc32 is stable across processes, unlike the built-in hash()
+    return zlib.crc32(feature.encode('utf-8'))
+
+
+def embed_text(text):
+    """
+    Hashed bag of words and character trigrams, L2-normalised
+
+    Each feature is hashed into one of EMBEDDING_DIM buckets with a hashed
+    sign, so collisions tend to cancel out instead of piling up.
+    """
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    words = _WORD_RE.findall(text.lower())
+
+    features = [f'w:{word}' for word in words]
+    for word in words:
+        padded = f' {word} '
+        features.extend(
+            f'c:{padded[i:i + NGRAM_SIZE]}'
+            for i in range(len(padded) - NGRAM_SIZE + 1)
+        )
+
+    for feature in features:
+        h = _hash(feature)
+        vector[h % EMBEDDING_DIM] += 1.0 if (h >> 31) & 1 else -1.0
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def _task_text(title, description):
+    return f"{title} {title} {description or ''}"
+
+
+def _days_to_complete(status, created_at, updated_at):
+    # There is no completed_at, so the last update of a completed task is
+    # the best available completion time
+    if status != 'completed' or not created_at or not updated_at:
+        return None
+    return round((updated_at - created_at).total_seconds() / 86400, 1)
+
+
+class TaskIndex:
+    """
+    In-memory cosine similarity index over one user's tasks
+
+    Indexes shared through _indexes are only changed by _apply_change, which
+    holds ``lock``; query() takes the same lock so it never sees a half-moved
+    row.
+    """
+    def __init__(self, version):
+        self.version = version
+        self.vectors = np.zeros((MIN_CAPACITY, EMBEDDING_DIM), dtype=np.float32)
+        self.ids = []
+        self.meta = []
+        self.positions = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def capacity(self):
+        return len(self.vectors)
+
+    def trim(self):
+        """Release rows allocated beyond the ones in use"""
+        if self.capacity > max(len(self.ids), MIN_CAPACITY):
+            self.vectors = self.vectors[:max(len(self.ids), MIN_CAPACITY)].copy()
+
+    def upsert(self, task_id, title, description, category_id, priority, status,
+               created_at, updated_at):
+        meta = {
+            'id': task_id,
+            'title': title,
+            'category_id': category_id,
+            'priority': priority,
+            'status': status,
+            'created_at': created_at,
+            'days_to_complete': _days_to_complete(status, created_at, updated_at)
+        }
+        position = self.positions.get(task_id)
+        if position is None:
+            if len(self.ids) >= MAX_INDEXED_TASKS:
+                # Keep the most recent tasks, like a fresh build would
+                oldest = min(self.positions)
+                if task_id < oldest:
+                    return
+                self.remove(oldest)
+            position = len(self.ids)
+            if position == self.capacity:
+                grown = np.zeros(
+                    (min(self.capacity * 2, MAX_INDEXED_TASKS), EMBEDDING_DIM),
+                    dtype=np.float32
+                )
+                grown[:position] = self.vectors[:position]
+                self.vectors = grown
+            self.ids.append(task_id)
+            self.meta.append(meta)
+            self.positions[task_id] = position
+        else:
+            self.meta[position] = meta
+        self.vectors[position] = embed_text(_task_text(title, description))
+
+    def set_status(self, task_id, status, updated_at):
+        """Update a task's status without re-embedding it"""
+        position = self.positions.get(task_id)
+        if position is None:
+            return
+        meta = self.meta[position]
+        meta['status'] = status
+        meta['days_to_complete'] = _days_to_complete(status, meta['created_at'], updated_at)
+
+    def remove(self, task_id):
+        position = self.positions.pop(task_id, None)
+        if position is None:
+            return
+        last = len(self.ids) - 1
+        if position != last:
+            # Move the last row into the freed slot
+            self.vectors[position] = self.vectors[last]
+            self.ids[position] = self.ids[last]
+            self.meta[position] = self.meta[last]
+            self.positions[self.ids[position]] = position
+        self.ids.pop()
+        self.meta.pop()
+
+        capacity = self.capacity
+        if capacity > MIN_CAPACITY and len(self.ids) <= capacity // 4:
+            self.vectors = self.vectors[:capacity // 2].copy()
+
+    def query(self, text, k=5, exclude_id=None):
+        """
+        Closest tasks to the text, best first, as (score, meta) tuples
+        """
+        vector = embed_text(text)
+        with self.lock:
+            if not self.ids:
+                return []
+            scores = self.vectors[:len(self.ids)] @ vector
+            if exclude_id in self.positions:
+                scores[self.positions[exclude_id]] = -1.0
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            # Copies, since set_status updates meta in place
+            return [
+                (float(scores[i]), dict(self.meta[i]))
+                for i in top if scores[i] >= MIN_SIMILARITY
+            ]
+
+
+# Per-process indexes, keyed by user id, least recently used first
+_indexes = OrderedDict()
+_rebuilding = set()
+_lock = threading.Lock()
+
+
+def _version_key(user_id):
+    return f'similarity:{user_id}:version'
+
+
+def _get_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _build_index(user_id, version):
+    index = TaskIndex(version)
+    # Read from the primary so a lagging replica can't be cached under the
+    # current version
+    rows = Task.objects.using('default').filter(user_id=user_id).order_by('-id').values_list(
+        'id', 'title', 'description', 'category_id', 'priority', 'status',
+        'created_at', 'updated_at'
+    )[:MAX_INDEXED_TASKS].iterator(chunk_size=2000)
+    for row in rows:
+        index.upsert(*row)
+    index.trim()
+    return index
+
+
+def _evict():
+    """Drop least recently used indexes until the process is within bounds"""
+    total_rows = sum(index.capacity for index in _indexes.values())
+    while len(_indexes) > 1 and (
+            len(_indexes) > MAX_CACHED_USERS or total_rows > MAX_TOTAL_ROWS):
+        _, index = _indexes.popitem(last=False)
+        total_rows -= index.capacity
+
+
+def _store_index(user_id, index):
+    with _lock:
+        current = _indexes.get(user_id)
+        if current is not None and current.version > index.version:
+            # A build that started earlier finished later
+            return
+        _indexes[user_id] = index
+        _indexes.move_to_end(user_id)
+        _evict()
+
+
+def _build_in_background(user_id, version):
+    with _lock:
+        if user_id in _rebuilding:
+            return
+        _rebuilding.add(user_id)
+
+    def run():
+        try:
+            _store_index(user_id, _build_index(user_id, version))
+        except Exception as e:
+            print(f"Similarity index build error: {e}")
+        finally:
+            with _lock:
+                _rebuilding.discard(user_id)
+            # Connections are per thread; don't leak this one
+            connections.close_all()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_index(user_id):
+    """
+    The user's index, or None while its first build is still running
+
+    When another process has changed the user's tasks since the index was
+    built, the current index keeps serving while a fresh one is built.
+    """
+    version = _get_version(user_id)
+    with _lock:
+        index = _indexes.get(user_id)
+        if index is not None:
+            _indexes.move_to_end(user_id)
+
+    if index is not None and index.version == version:
+        return index
+    if BUILD_IN_BACKGROUND:
+        _build_in_background(user_id, version)
+        return index
+
+    index = _build_index(user_id, version)
+    _store_index(user_id, index)
+    return index
+
+
+def _bump_version(user_id):
+    key = _version_key(user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+        return cache.get(key)
+
+
+def _apply_change(user_id, change):
+    """
+    Apply a change to this process's index and bump the shared version
+
+    If the version moved by more than our own bump, another process changed
+    the user's tasks too; the index is left as is and get_index rebuilds it.
+
+    Returns:
+        This process's index for the user, or None if it has none
+    """
+    with _lock:
+        index = _indexes.get(user_id)
+        expected = index.version + 1 if index is not None else None
+        version = _bump_version(user_id)
+        if index is not None and version == expected:
+            with index.lock:
+                change(index)
+                index.version = version
+            _evict()
+    return index
+
+
+def task_saved(task):
+    index = _apply_change(task.user_id, lambda index: index.upsert(
+        task.id, task.title, task.description, task.category_id, task.priority,
+        task.status, task.created_at, task.updated_at
+    ))
+    if index is None and BUILD_IN_BACKGROUND:
+        # Warm the index now so the user's next suggestion request has it
+        _build_in_background(task.user_id, _get_version(task.user_id))
+
+
+def task_status_changed(user_id, task_id, status, updated_at):
+    """Apply a status written without save(), e.g. by transition_status"""
+    _apply_change(user_id, lambda index: index.set_status(task_id, status, updated_at))
+
+
+def task_deleted(task):
+    _apply_change(task.user_id, lambda index: index.remove(task.id))
+
+
+def invalidate_index(user_id):
+    """Force a rebuild, e.g. after bulk writes that send no signals"""
+    _bump_version(user_id)
+    with _lock:
+        _indexes.pop(user_id, None)
+
+
+def find_similar_tasks(user_id, text, k=5, exclude_id=None):
+    """
+    The user's past tasks closest to the text
+
+    Returns:
+        List of dicts with title, category, priority, status,
+        days_to_complete and similarity, best match first
+    """
+    index = get_index(user_id)
+    if index is None:
+        return []
+    matches = index.query(text, k=k, exclude_id=exclude_id)
+    category_ids = {meta['category_id'] for _, meta in matches}
+    category_names = dict(
+        Category.objects.filter(id__in=category_ids).values_list('id', 'name')
+    ) if category_ids else {}
+
+    return [
+        {
+            'title': meta['title'],
+            'category': category_names.get(meta['category_id'], ''),
+            'priority': meta['priority'],
+            'status': meta['status'],
+            'days_to_complete': meta['days_to_complete'],
+            'similarity': round(score, 3)
+        }
+        for score, meta in matches
+    ]
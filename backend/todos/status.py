@@ -0,0 +1,90 @@
+from django.db import connections, router, transaction
+from django.utils import timezone
+from .models import Task
+from .priority import OPEN_STATUSES, compute_effective_priority
+
+
+def _supports_update_returning(connection):
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+def _refresh_effective_priority(alias, task_id, now):
+    task = Task.objects.using(alias).only(
+        'priority', 'due_date', 'created_at', 'effective_priority'
+    ).get(pk=task_id)
+    effective = compute_effective_priority(task.priority, task.due_date, task.created_at, now)
+    if effective != task.effective_priority:
+        Task.objects.using(alias).filter(pk=task_id).update(effective_priority=effective)
+
+
+def transition_status(task_id, target=None):
+    """
+    Flip a task between pending and completed, or set it to ``target``
+
+    The change is a single conditional UPDATE touching only status and
+    updated_at, so concurrent toggles never overwrite each other or any
+    other column. Where the database supports UPDATE ... RETURNING the new
+    state comes back from the same statement; elsewhere it is read back in
+    the same transaction.
+
+    Completed tasks are left out of recompute_priorities, so a task that is
+    reopened gets its effective priority recomputed in the same transaction.
+
+    Returns:
+        Tuple of (status, updated_at), or None if the task does not exist
+    """
+    now = timezone.now()
+    connection = connections[router.db_for_write(Task)]
+    quote = connection.ops.quote_name
+    table = quote(Task._meta.db_table)
+    status_column = quote(Task._meta.get_field('status').column)
+    updated_column = quote(Task._meta.get_field('updated_at').column)
+    user_column = quote(Task._meta.get_field('user').column)
+    pk_column = quote(Task._meta.pk.column)
+
+    if target is None:
+        status_sql = (
+            f"CASE WHEN {status_column} = 'completed' THEN 'pending' ELSE 'completed' END"
+        )
+        params = []
+    else:
+        status_sql = '%s'
+        params = [target]
+    params += [Task._meta.get_field('updated_at').get_db_prep_value(now, connection), task_id]
+
+    update_sql = (
+        f"UPDATE {table} SET {status_column} = {status_sql}, {updated_column} = %s "
+        f"WHERE {pk_column} = %s"
+    )
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if _supports_update_returning(connection):
+            cursor.execute(f"{update_sql} RETURNING {status_column}, {user_column}", params)
+            row = cursor.fetchone()
+        else:
+            cursor.execute(update_sql, params)
+            row = None
+            if cursor.rowcount:
+                cursor.execute(
+                    f"SELECT {status_column}, {user_column} FROM {table} WHERE {pk_column} = %s",
+                    [task_id]
+                )
+                row = cursor.fetchone()
+
+        if row is not None and row[0] in OPEN_STATUSES:
+            _refresh_effective_priority(connection.alias, task_id, now)
+
+    if row is None:
+        return None
+
+    new_status, user_id = row
+
+    # No post_save is sent, so update the similarity index directly
+    from .similarity import task_status_changed
+
+    task_status_changed(user_id, task_id, new_status, now)
+    return new_status, now
@@ -0,0 +1,233 @@
+import csv
+import json
+from django.db import transaction
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Task, Category
+from .category_cache import get_category_map, invalidate_categories
+from .priority import compute_effective_priority
+
+# Columns written by the export and understood by the import
+EXPORT_FIELDS = [
+    'id', 'title', 'description', 'priority', 'status', 'category',
+    'due_date', 'ai_suggested', 'created_at', 'updated_at'
+]
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 50
+
+VALID_STATUSES = {choice for choice, _ in Task.STATUS_CHOICES}
+
+
+class Echo:
+    """File-like object that hands back whatever is written to it"""
+    def write(self, value):
+        return value
+
+
+def iter_task_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one dict per task, reading from a server-side cursor
+
+    Only the exported columns are fetched, and the category name is joined
+    in SQL so no model instances are built.
+    """
+    rows = queryset.order_by('id').values_list(
+        'id', 'title', 'description', 'priority', 'status', 'category__name',
+        'due_date', 'ai_suggested', 'created_at', 'updated_at'
+    ).iterator(chunk_size=chunk_size)
+
+    for row in rows:
+        yield dict(zip(EXPORT_FIELDS, row))
+
+
+def stream_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    for row in iter_task_rows(queryset, chunk_size):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in iter_task_rows(queryset, chunk_size):
+        yield writer.writerow([
+            row[field].isoformat() if hasattr(row[field], 'isoformat') else row[field]
+            for field in EXPORT_FIELDS
+        ])
+
+
+def iter_text_lines(stream):
+    """Decode a binary stream line by line without reading it all into memory"""
+    first = True
+    for raw_line in iter(stream.readline, b''):
+        line = raw_line.decode('utf-8')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+def iter_ndjson_records(lines):
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def iter_csv_records(lines):
+    reader = csv.DictReader(lines)
+    for record in reader:
+        # Header is line 1, so the first record is reported as line 2
+        yield reader.line_num, record, None
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _text(record, field, default=''):
+    """A string field from a record; non-string values are row errors"""
+    value = record.get(field)
+    if value is None or value == '':
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value.strip()
+
+
+def build_task(record, user):
+    """
+    Build an unsaved Task from an imported record, without its category
+
+    Raises ValueError for records that cannot be imported.
+    """
+    title = _text(record, 'title')
+    if not title:
+        raise ValueError("Missing title")
+
+    priority = record.get('priority')
+    if priority in (None, ''):
+        priority = 50
+    priority = max(0, min(100, int(priority)))
+
+    status = _text(record, 'status', 'pending')
+    if status not in VALID_STATUSES:
+        raise ValueError(f"Unknown status '{status}'")
+
+    due_date = record.get('due_date') or None
+    if due_date:
+        parsed = parse_datetime(str(due_date))
+        if parsed is None:
+            raise ValueError(f"Invalid due_date '{due_date}'")
+        # Timestamps without an offset are in the current time zone
+        due_date = timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+    return Task(
+        title=title[:200],
+        description=_text(record, 'description'),
+        priority=priority,
+        effective_priority=compute_effective_priority(
+            priority, due_date, None, timezone.now()
+        ),
+        status=status,
+        due_date=due_date,
+        ai_suggested=_parse_bool(record.get('ai_suggested') or False),
+        user=user
+    )
+
+
+def import_tasks(records, user, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Insert tasks from an iterable of (line_number, record, error) tuples
+
+    Tasks are written with bulk_create in batches of ``batch_size`` so memory
+    stays bounded regardless of input size. Categories are resolved by name
+    and created on first use.
+
+    Rows that fail validation are skipped and reported. The import as a whole
+    runs in one transaction, so any other failure rolls back every category
+    and batch written so far.
+
+    Returns:
+        Dictionary with counts of created tasks and categories plus row errors
+    """
+    categories = dict(get_category_map(user.id))
+    created = 0
+    categories_created = 0
+    failed = 0
+    errors = []
+    batch = []
+
+    def report(line_number, message):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'line': line_number, 'error': message})
+
+    with transaction.atomic():
+        for line_number, record, error in records:
+            if error:
+                failed += 1
+                report(line_number, error)
+                continue
+
+            try:
+                task = build_task(record, user)
+                category_name = _text(record, 'category', 'personal').title()
+                category_id = categories.get(category_name.lower())
+                if category_id is None:
+                    category, was_created = Category.objects.get_or_create(
+                        user=user,
+                        name=category_name,
+                        defaults={
+                            'color': '#6B7280',
+                            'icon': 'folder'
+                        }
+                    )
+                    category_id = category.id
+                    categories[category_name.lower()] = category_id
+                    if was_created:
+                        categories_created += 1
+
+                task.category_id = category_id
+                batch.append(task)
+            except (ValueError, TypeError, AttributeError, OverflowError) as e:
+                failed += 1
+                report(line_number, str(e))
+                continue
+
+            if len(batch) >= batch_size:
+                Task.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+
+        if batch:
+            Task.objects.bulk_create(batch)
+            created += len(batch)
+
+    # bulk_create sends no signals, so refresh cached task counts and the
+    # similarity index here, after commit so no process caches rows that
+    # weren't visible yet
+    if created:
+        from .similarity import invalidate_index
+
+        invalidate_categories(user.id)
+        invalidate_index(user.id)
+
+    return {
+        'created': created,
+        'failed': failed,
+        'categories_created': categories_created,
+        'errors': errors
+    }
@@ -0,0 +1,638 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import warnings
+from datetime import datetime, timedelta
+from unittest import mock, skipIf, skipUnless
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.conf import settings
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+from smartapi.database import build_database
+from smartapi.middleware import classify_request
+from smartapi.routers import use_replica
+from ai_providers import GeminiProvider, StubProvider, get_provider, set_provider, reset_provider
+from .models import Task, Category, ContextEntry
+from .category_cache import get_category_map, get_category_list
+from .priority import compute_effective_priority, recompute_priorities
+from .management.commands.bench_startup import SDK_PROBE
+from . import similarity, status
+
+
+def ndjson(*records):
+    return "\n".join(
+        record if isinstance(record, str) else json.dumps(record)
+        for record in records
+    )
+
+
+class TodosTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        similarity._indexes.clear()
+        # Test data is uncommitted, so other threads can't see it
+        patcher = mock.patch.object(similarity, 'BUILD_IN_BACKGROUND', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.user, _ = User.objects.get_or_create(
+            username='default_user',
+            defaults={'email': 'user@example.com'}
+        )
+
+    def import_ndjson(self, *records):
+        return self.client.post(
+            '/api/tasks/import/', ndjson(*records), content_type='application/x-ndjson'
+        )
+
+
+class TaskImportExportTests(TodosTestCase):
+    def test_ndjson_round_trip(self):
+        response = self.import_ndjson(
+            {'title': 'Write report', 'category': 'work', 'priority': 80,
+             'due_date': '2030-01-01T10:00:00Z'},
+            {'title': 'Buy milk', 'category': 'shopping', 'status': 'completed'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['categories_created'], 2)
+
+        response = self.client.get('/api/tasks/export/')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(
+            [(row['title'], row['category'], row['priority'], row['status']) for row in rows],
+            [('Write report', 'Work', 80, 'pending'), ('Buy milk', 'Shopping', 50, 'completed')]
+        )
+        self.assertEqual(rows[0]['due_date'], '2030-01-01T10:00:00Z')
+
+    def test_csv_round_trip(self):
+        self.import_ndjson({'title': 'Write report', 'category': 'work', 'priority': 80})
+        response = self.client.get('/api/tasks/export/?file_format=csv')
+        exported = b''.join(response.streaming_content)
+
+        Task.objects.all().delete()
+        upload = SimpleUploadedFile('tasks.csv', exported, content_type='text/csv')
+        response = self.client.post('/api/tasks/import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 0))
+        task = Task.objects.select_related('category').get()
+        self.assertEqual((task.title, task.category.name, task.priority), ('Write report', 'Work', 80))
+        # The existing category is reused
+        self.assertEqual(Category.objects.count(), 1)
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        response = self.import_ndjson(
+            {'title': 'Good', 'category': 'work'},
+            {'title': 123, 'category': 'health'},
+            {'title': 'Bad category', 'category': ['x']},
+            '{not json',
+            {'title': 'Bad status', 'status': 'done'},
+            {'title': ''},
+            '{"title": "Infinite", "priority": Infinity}',
+            '{"title": "Huge", "priority": 1e400}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 7))
+        self.assertEqual(
+            [error['line'] for error in response.data['errors']], [2, 3, 4, 5, 6, 7, 8]
+        )
+        # Rejected rows don't leave categories behind
+        self.assertEqual(list(Category.objects.values_list('name', flat=True)), ['Work'])
+
+    def test_due_dates_without_offset(self):
+        # Django warns when saving naive datetimes; none should reach it
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            response = self.import_ndjson(
+                {'title': 'Naive', 'due_date': '2030-01-01T10:00:00'},
+                {'title': 'Aware', 'due_date': '2030-01-01T10:00:00+02:00'},
+            )
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(
+            Task.objects.get(title='Naive').due_date,
+            timezone.make_aware(datetime(2030, 1, 1, 10))
+        )
+        self.assertEqual(
+            Task.objects.get(title='Aware').due_date,
+            timezone.make_aware(datetime(2030, 1, 1, 8))
+        )
+
+    def test_failed_import_rolls_back(self):
+        with mock.patch.object(Task.objects, 'bulk_create', side_effect=RuntimeError('boom')):
+            response = self.import_ndjson({'title': 'Task', 'category': 'travel'})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(Category.objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+
+class CategoryCacheTests(TodosTestCase):
+    def tearDown(self):
+        reset_provider()
+
+    def test_process_resolves_categories_once(self):
+        extracted = {
+            'extracted_tasks': [
+                {'title': f'Task {i}', 'description': '', 'priority_score': 50,
+                 'suggested_category': 'work'}
+                for i in range(3)
+            ],
+            'summary': 'Three tasks',
+            'confidence': 90
+        }
+        set_provider(StubProvider(json.dumps(extracted)))
+        Category.objects.create(user=self.user, name='Work')
+        entry = ContextEntry.objects.create(user=self.user, content='notes')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/context/{entry.id}/process/')
+
+        self.assertEqual(len(response.data['tasks']), 3)
+        category_reads = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and 'FROM "todos_category"' in query['sql']
+        ]
+        self.assertEqual(len(category_reads), 1)
+
+    def test_task_writes_refresh_list_counts(self):
+        category = Category.objects.create(user=self.user, name='Work')
+        self.assertEqual(self.client.get('/api/categories/').data['results'][0]['task_count'], 0)
+
+        Task.objects.create(user=self.user, category=category, title='Task')
+        self.assertEqual(self.client.get('/api/categories/').data['results'][0]['task_count'], 1)
+
+    def test_category_writes_refresh_name_map(self):
+        category = Category.objects.create(user=self.user, name='Work')
+        self.assertEqual(get_category_map(self.user.id), {'work': category.id})
+
+        category.name = 'Office'
+        category.save()
+        self.assertEqual(get_category_map(self.user.id), {'office': category.id})
+
+        category.delete()
+        self.assertEqual(get_category_map(self.user.id), {})
+
+
+class PriorityTests(TodosTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(user=self.user, name='Work')
+        self.now = timezone.now()
+
+    def create_task(self, **kwargs):
+        return Task.objects.create(user=self.user, category=self.category, title='Task', **kwargs)
+
+    def test_deadline_boost(self):
+        overdue = compute_effective_priority(50, self.now - timedelta(hours=1), None, self.now)
+        due_soon = compute_effective_priority(50, self.now + timedelta(hours=12), None, self.now)
+        far_off = compute_effective_priority(50, self.now + timedelta(days=60), None, self.now)
+        self.assertEqual(overdue, 90)
+        self.assertTrue(overdue > due_soon > far_off)
+        self.assertEqual(far_off, 50)
+        self.assertEqual(compute_effective_priority(90, self.now, None, self.now), 100)
+
+    def test_age_boost_is_capped(self):
+        week_old = compute_effective_priority(50, None, self.now - timedelta(days=6), self.now)
+        year_old = compute_effective_priority(50, None, self.now - timedelta(days=365), self.now)
+        self.assertEqual(week_old, 53)
+        self.assertEqual(year_old, 65)
+
+    def test_naive_due_dates(self):
+        # Django only warns about naive datetimes, so saving must not fail
+        with self.assertWarns(RuntimeWarning):
+            task = self.create_task(due_date=datetime(2000, 1, 1))
+        self.assertEqual(task.effective_priority, 90)
+        self.assertEqual(
+            compute_effective_priority(50, datetime(2000, 1, 1), None, self.now), 90
+        )
+
+    def test_recompute_walks_batches_and_writes_changed_rows(self):
+        tasks = [self.create_task() for _ in range(5)]
+        self.create_task(status='completed')
+        stale = tasks[1::2]
+        Task.objects.filter(id__in=[task.id for task in stale]).update(effective_priority=0)
+        before = dict(Task.objects.values_list('id', 'updated_at'))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(recompute_priorities(batch_size=2), (5, 2))
+
+        selects = [query for query in queries if query['sql'].startswith('SELECT')]
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        # Three full or partial batches plus the empty one that ends the walk
+        self.assertEqual(len(selects), 4)
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            set(Task.objects.filter(status='pending').values_list('effective_priority', flat=True)),
+            {50}
+        )
+        self.assertEqual(dict(Task.objects.values_list('id', 'updated_at')), before)
+
+    def test_recompute_command(self):
+        self.create_task(due_date=self.now - timedelta(days=1))
+        Task.objects.update(effective_priority=0)
+        out = io.StringIO()
+        call_command('recompute_priorities', batch_size=10, stdout=out)
+        self.assertIn('Scanned 1 open tasks, updated 1', out.getvalue())
+        self.assertEqual(Task.objects.get().effective_priority, 90)
+
+
+class AIProviderTests(TodosTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_provider()
+        self.addCleanup(reset_provider)
+
+    def test_views_do_not_import_the_sdk(self):
+        result = subprocess.run(
+            [sys.executable, '-c', SDK_PROBE + (
+                "import django; django.setup(); import todos.views; print(SdkProbe.imported)"
+            )],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE='smartapi.settings')
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], 'False')
+
+    @override_settings(AI_PROVIDER='stub')
+    def test_stub_provider(self):
+        self.assertIsInstance(get_provider(), StubProvider)
+        self.assertIs(get_provider(), get_provider())
+
+    @override_settings(AI_PROVIDER='gemini', GEMINI_API_KEY='key')
+    def test_gemini_provider_is_lazy(self):
+        with mock.patch.dict(sys.modules, {'google.generativeai': None}):
+            provider = get_provider()
+        self.assertIsInstance(provider, GeminiProvider)
+        self.assertIsNone(provider._model)
+
+    @override_settings(AI_PROVIDER='gemini', GEMINI_API_KEY='')
+    def test_gemini_without_key(self):
+        self.assertIsNone(get_provider())
+
+    @override_settings(AI_PROVIDER='unknown')
+    def test_unknown_provider(self):
+        self.assertIsNone(get_provider())
+
+    def test_bench_startup_loads_the_urlconf(self):
+        out = io.StringIO()
+        call_command('bench_startup', runs=1, stdout=out)
+        self.assertIn('AI SDK imported at boot: no', out.getvalue())
+
+
+class AdminSearchTests(TodosTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+        category = Category.objects.create(user=self.user, name='Work')
+        Task.objects.create(user=self.user, category=category, title='Quarterly report')
+        Task.objects.create(user=self.admin, category=category, title='Report expenses')
+
+    def search(self, url, term):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(url, {'q': term})
+        self.assertNotIn('UPPER(', ' '.join(query['sql'] for query in queries))
+        return [str(obj.pk) for obj in response.context['cl'].result_list]
+
+    @skipIf(connection.vendor == 'postgresql', 'Prefix search is the fallback')
+    def test_task_search_matches_title_prefix(self):
+        quarterly = Task.objects.get(title='Quarterly report')
+        self.assertEqual(self.search('/admin/todos/task/', 'Quarter'), [str(quarterly.pk)])
+        # Substrings that aren't a prefix don't match
+        self.assertEqual(self.search('/admin/todos/task/', 'terly'), [])
+
+    def test_task_search_matches_exact_username(self):
+        expenses = Task.objects.get(title='Report expenses')
+        self.assertEqual(self.search('/admin/todos/task/', 'admin'), [str(expenses.pk)])
+
+    @skipUnless(connection.vendor == 'postgresql', 'Full-text search needs PostgreSQL')
+    def test_full_text_search(self):
+        quarterly = Task.objects.get(title='Quarterly report')
+        quarterly.description = 'Numbers for the board'
+        quarterly.save()
+        entry = ContextEntry.objects.create(user=self.user, content='Draft the quarterly numbers')
+
+        self.assertEqual(self.search('/admin/todos/task/', 'quarterly'), [str(quarterly.pk)])
+        self.assertEqual(self.search('/admin/todos/task/', 'board'), [str(quarterly.pk)])
+        self.assertEqual(self.search('/admin/todos/contextentry/', 'quarterly'), [str(entry.pk)])
+
+    @skipIf(connection.vendor == 'postgresql', 'Content is only searched on PostgreSQL')
+    def test_context_search_matches_exact_username(self):
+        entry = ContextEntry.objects.create(user=self.admin, content='notes')
+        ContextEntry.objects.create(user=self.user, content='admin notes')
+        self.assertEqual(self.search('/admin/todos/contextentry/', 'admin'), [str(entry.pk)])
+        self.assertEqual(self.search('/admin/todos/contextentry/', 'nobody'), [])
+
+
+class SimilarityIndexTests(TodosTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(user=self.user, name='Finance')
+
+    def create_task(self, title, **kwargs):
+        return Task.objects.create(user=self.user, category=self.category, title=title, **kwargs)
+
+    def test_finds_similar_tasks_and_tracks_saves(self):
+        self.create_task('Pay electricity bill', priority=70)
+        self.create_task('Walk the dog')
+        matches = similarity.find_similar_tasks(self.user.id, 'pay water bill')
+        self.assertEqual([match['title'] for match in matches], ['Pay electricity bill'])
+        self.assertEqual(matches[0]['category'], 'Finance')
+
+        # Saved after the index was built, applied incrementally
+        task = self.create_task('Pay water bill')
+        self.assertEqual(
+            similarity.find_similar_tasks(self.user.id, 'pay water bill')[0]['title'],
+            'Pay water bill'
+        )
+        task.delete()
+        self.assertNotIn(
+            'Pay water bill',
+            [match['title'] for match in similarity.find_similar_tasks(self.user.id, 'pay water bill')]
+        )
+
+    def test_cached_indexes_are_bounded(self):
+        other = User.objects.create(username='other')
+        with mock.patch.object(similarity, 'MAX_CACHED_USERS', 1):
+            similarity.get_index(self.user.id)
+            similarity.get_index(other.id)
+        self.assertEqual(list(similarity._indexes), [other.id])
+
+    def test_index_keeps_most_recent_tasks(self):
+        tasks = [self.create_task(f'Task {i}') for i in range(4)]
+        similarity._indexes.clear()
+        with mock.patch.object(similarity, 'MAX_INDEXED_TASKS', 2):
+            index = similarity.get_index(self.user.id)
+            self.assertEqual(sorted(index.ids), [tasks[2].id, tasks[3].id])
+
+            self.create_task('Task 4')
+            self.assertEqual(len(index), 2)
+            self.assertNotIn(tasks[2].id, index.ids)
+
+    def test_stale_index_is_rebuilt_in_background(self):
+        self.create_task('Pay electricity bill')
+        index = similarity.get_index(self.user.id)
+        # Simulate a write from another process
+        similarity._bump_version(self.user.id)
+
+        with mock.patch.object(similarity, 'BUILD_IN_BACKGROUND', True), \
+                mock.patch.object(similarity, '_build_in_background') as build:
+            self.assertIs(similarity.get_index(self.user.id), index)
+        build.assert_called_once()
+
+    def test_first_build_is_off_the_request_path(self):
+        with mock.patch.object(similarity, 'BUILD_IN_BACKGROUND', True), \
+                mock.patch.object(similarity, '_build_in_background') as build:
+            # Saving warms the index for the user's next request
+            self.create_task('Pay electricity bill')
+            build.assert_called_once()
+            self.assertEqual(similarity.find_similar_tasks(self.user.id, 'pay bill'), [])
+        self.assertEqual(build.call_count, 2)
+
+    def test_total_rows_are_bounded(self):
+        other = User.objects.create(username='other')
+        self.create_task('Pay electricity bill')
+        index = similarity.get_index(self.user.id)
+        # Built indexes are trimmed to the rows they use
+        self.assertEqual(index.capacity, similarity.MIN_CAPACITY)
+
+        with mock.patch.object(similarity, 'MAX_TOTAL_ROWS', similarity.MIN_CAPACITY):
+            similarity.get_index(other.id)
+        self.assertEqual(list(similarity._indexes), [other.id])
+
+    def test_suggestions_survive_lookup_errors(self):
+        set_provider(StubProvider())
+        self.addCleanup(reset_provider)
+        with mock.patch.object(similarity, 'find_similar_tasks', side_effect=RuntimeError('boom')):
+            response = self.client.post(
+                '/api/tasks/ai_suggestions/', {'title': 'Pay bill'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['similar_tasks'], [])
+
+    def test_query_returns_copies(self):
+        self.create_task('Pay electricity bill')
+        index = similarity.get_index(self.user.id)
+        _, meta = index.query('pay electricity bill')[0]
+        meta['status'] = 'completed'
+        self.assertEqual(index.meta[0]['status'], 'pending')
+
+    def test_remove_shrinks_storage(self):
+        index = similarity.TaskIndex(version=0)
+        for i in range(300):
+            index.upsert(i, f'Task {i}', '', self.category.id, 50, 'pending', None, None)
+        self.assertEqual(len(index.vectors), 512)
+        for i in range(290):
+            index.remove(i)
+        self.assertLess(len(index.vectors), 512)
+        self.assertEqual(sorted(index.ids), list(range(290, 300)))
+
+
+class ReplicaRoutingTests(TodosTestCase):
+    def test_cache_fills_read_from_primary(self):
+        category = Category.objects.create(user=self.user, name='Work')
+        Task.objects.create(user=self.user, category=category, title='Task')
+
+        # Any read routed through the router could land on a replica
+        with mock.patch('django.db.router.db_for_read', side_effect=AssertionError('routed read')):
+            self.assertEqual(get_category_map(self.user.id), {'work': category.id})
+            self.assertEqual(get_category_list(self.user.id)[0]['task_count'], 1)
+            similarity.get_index(self.user.id)
+
+
+class DatabaseSettingsTests(TestCase):
+    def classify(self, method, path):
+        request = getattr(RequestFactory(), method)(path)
+        request.resolver_match = resolve(path)
+        return classify_request(request)
+
+    def test_classify_request(self):
+        self.assertEqual(self.classify('get', '/api/tasks/'), 'list')
+        self.assertEqual(self.classify('get', '/api/tasks/stats/'), 'list')
+        self.assertEqual(self.classify('get', '/api/tasks/export/'), 'export')
+        self.assertEqual(self.classify('get', '/api/tasks/1/'), 'read')
+        self.assertEqual(self.classify('post', '/api/tasks/'), 'write')
+        self.assertEqual(self.classify('patch', '/api/tasks/1/toggle_status/'), 'write')
+
+    def test_build_database(self):
+        database = build_database('postgres://user:pw@db:5432/todos', conn_max_age=30)
+        self.assertEqual(database['CONN_MAX_AGE'], 30)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        # Timeouts are set per request, never on connect
+        self.assertNotIn('options', database['OPTIONS'])
+        self.assertFalse(database['DISABLE_SERVER_SIDE_CURSORS'])
+
+        database = build_database('postgres://user:pw@db:5432/todos', pgbouncer=True)
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+
+        sqlite = build_database('sqlite:///db.sqlite3', pgbouncer=True, pool=True)
+        self.assertFalse(sqlite.get('DISABLE_SERVER_SIDE_CURSORS'))
+        self.assertNotIn('pool', sqlite.get('OPTIONS', {}))
+
+    def test_build_database_pool(self):
+        with mock.patch('django.VERSION', (4, 2, 0, 'final', 0)):
+            database = build_database('postgres://user:pw@db:5432/todos', pool=True)
+        self.assertNotIn('pool', database['OPTIONS'])
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+
+        with mock.patch('django.VERSION', (5, 1, 0, 'final', 0)):
+            database = build_database(
+                'postgres://user:pw@db:5432/todos', pool=True, pool_max_size=4
+            )
+        self.assertEqual(database['OPTIONS']['pool'], {'min_size': 2, 'max_size': 4})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+
+class ReplicaRequestTests(TransactionTestCase):
+    """
+    Requests against a SQLite replica mirroring default
+
+    A TransactionTestCase, since the replica is a separate connection that
+    can't see data from another connection's open transaction.
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Registered here rather than in settings so the runner, which reads
+        # `databases` before any test runs, doesn't try to set it up
+        replica = {**connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'}}
+        cls.replica = mock.patch.dict(settings.DATABASES, {'replica': replica})
+        cls.replica.start()
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        del connections['replica']
+        cls.replica.stop()
+
+    def setUp(self):
+        cache.clear()
+        similarity._indexes.clear()
+        patcher = mock.patch.object(similarity, 'BUILD_IN_BACKGROUND', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        user = User.objects.create(username='default_user')
+        category = Category.objects.create(user=user, name='Work')
+        self.task = Task.objects.create(user=user, category=category, title='Task')
+
+    def get(self, path):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(use_replica.get())
+        return [query['sql'] for query in primary], [query['sql'] for query in replica]
+
+    def test_list_and_stats_read_from_replica(self):
+        primary, replica = self.get('/api/tasks/')
+        self.assertTrue(any('FROM "todos_task"' in sql for sql in replica))
+        self.assertFalse(any('FROM "todos_task"' in sql for sql in primary))
+
+        primary, replica = self.get('/api/tasks/stats/')
+        self.assertEqual(len(replica), 5)
+
+    def test_other_reads_stay_on_primary(self):
+        primary, replica = self.get(f'/api/tasks/{self.task.id}/')
+        self.assertEqual(replica, [])
+        self.assertTrue(any('FROM "todos_task"' in sql for sql in primary))
+
+    def test_timeout_is_set_on_both_aliases(self):
+        with mock.patch('smartapi.middleware.set_statement_timeout') as set_timeout:
+            self.client.get('/api/tasks/')
+            self.assertEqual(
+                [call.args for call in set_timeout.call_args_list],
+                [('default', settings.DB_STATEMENT_TIMEOUTS['list']),
+                 ('replica', settings.DB_STATEMENT_TIMEOUTS['list'])]
+            )
+
+            set_timeout.reset_mock()
+            self.client.get(f'/api/tasks/{self.task.id}/')
+            self.assertEqual(
+                [call.args for call in set_timeout.call_args_list],
+                [('default', settings.DB_STATEMENT_TIMEOUTS['read'])]
+            )
+
+
+class ToggleStatusTests(TodosTestCase):
+    def setUp(self):
+        super().setUp()
+        category = Category.objects.create(user=self.user, name='Finance')
+        self.task = Task.objects.create(user=self.user, category=category, title='Pay electricity bill')
+
+    def toggle(self, data=None):
+        return self.client.patch(f'/api/tasks/{self.task.id}/toggle_status/', data or {}, format='json')
+
+    def test_toggle_is_a_single_update_returning_the_new_state(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.toggle()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'completed')
+        task_queries = [query['sql'] for query in queries if '"todos_task"' in query['sql']]
+        self.assertEqual(len(task_queries), 1)
+        self.assertTrue(task_queries[0].startswith('UPDATE'))
+        self.assertIn('RETURNING', task_queries[0])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'completed')
+        self.assertEqual(self.task.updated_at, response.data['updated_at'])
+
+    def test_fallback_without_returning(self):
+        with mock.patch.object(status, '_supports_update_returning', return_value=False):
+            self.assertEqual(status.transition_status(self.task.id)[0], 'completed')
+            self.assertEqual(status.transition_status(self.task.id, 'in_progress')[0], 'in_progress')
+            self.assertIsNone(status.transition_status(self.task.id + 100))
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'in_progress')
+
+    def test_toggles_apply_to_the_current_row(self):
+        # Both requests loaded the task while it was pending. A read-modify-write
+        # toggle would write 'completed' twice; the conditional UPDATE flips twice.
+        stale = Task.objects.get(pk=self.task.pk)
+        self.assertEqual(self.toggle().data['status'], 'completed')
+        self.assertEqual(self.toggle().data['status'], 'pending')
+
+        # A partial update from a stale copy doesn't overwrite the status
+        self.toggle()
+        stale.title = 'Pay gas bill'
+        stale.save(update_fields=['title', 'updated_at'])
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.status), ('Pay gas bill', 'completed'))
+
+    def test_explicit_status_and_errors(self):
+        self.assertEqual(self.toggle({'status': 'in_progress'}).data['status'], 'in_progress')
+        self.assertEqual(self.toggle({'status': 'done'}).status_code, 400)
+        self.assertEqual(self.client.patch('/api/tasks/9999/toggle_status/').status_code, 404)
+
+    def test_reopening_refreshes_effective_priority(self):
+        Task.objects.filter(pk=self.task.pk).update(
+            status='completed', due_date=timezone.now() - timedelta(days=1), effective_priority=0
+        )
+        self.assertEqual(self.toggle().data['status'], 'pending')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.effective_priority, 90)
+
+    def test_toggle_updates_similarity_index(self):
+        similarity.get_index(self.user.id)
+
+        self.toggle()
+        match = similarity.find_similar_tasks(self.user.id, 'pay electricity bill')[0]
+        self.assertEqual(match['status'], 'completed')
+        self.assertIsNotNone(match['days_to_complete'])
+
+        self.toggle()
+        match = similarity.find_similar_tasks(self.user.id, 'pay electricity bill')[0]
+        self.assertEqual((match['status'], match['days_to_complete']), ('pending', None))
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.contrib.auth.models import User
 from django.db.models import Q, Count
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime
 import traceback
@@ -12,6 +13,12 @@ from .serializers import (
     TaskSerializer, CategorySerializer, ContextEntrySerializer,
     AITaskSuggestionSerializer, TaskStatsSerializer, UserSerializer
 )
+from .task_io import (
+    stream_csv, stream_ndjson, iter_text_lines,
+    iter_csv_records, iter_ndjson_records, import_tasks
+)
+from .category_cache import get_category_list, resolve_category_id
+from .status import transition_status
 from ai_utils import get_ai_task_suggestions, process_context_for_tasks
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -21,6 +28,19 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Category.objects.all().order_by('name')
 
+    def list(self, request, *args, **kwargs):
+        """List the user's categories from the per-user category cache"""
+        user, created = User.objects.get_or_create(
+            username='default_user',
+            defaults={'email': 'user@example.com'}
+        )
+        categories = get_category_list(user.id)
+
+        page = self.paginate_queryset(categories)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(categories)
+
     def perform_create(self, serializer):
         user, created = User.objects.get_or_create(
             username='default_user',
@@ -96,6 +116,10 @@ class TaskViewSet(viewsets.ModelViewSet):
                 Q(title__icontains=search) | Q(description__icontains=search)
             )
         
+        # Sort by deadline-aware priority instead of sorting on the client
+        if self.request.query_params.get('ordering') == 'effective_priority':
+            return queryset.order_by('-effective_priority', '-created_at')
+
         return queryset.order_by('-created_at')
 
     def perform_create(self, serializer):
@@ -133,7 +157,25 @@ class TaskViewSet(viewsets.ModelViewSet):
                 title = serializer.validated_data['title']
                 context = serializer.validated_data.get('context', '')
                 
-                suggestions = get_ai_task_suggestions(title, context)
+                user, created = User.objects.get_or_create(
+                    username='default_user',
+                    defaults={'email': 'user@example.com'}
+                )
+
+                # Ground the model in the user's own history. Suggestions
+                # still work without it, so a failed lookup is not fatal
+                try:
+                    # Imported here to keep numpy out of process startup
+                    from .similarity import find_similar_tasks
+
+                    examples = find_similar_tasks(user.id, f"{title} {context}")
+                except Exception as e:
+                    print(f"Similar task lookup error: {e}")
+                    traceback.print_exc()
+                    examples = []
+
+                suggestions = get_ai_task_suggestions(title, context, examples)
+                suggestions['similar_tasks'] = examples
                 return Response(suggestions)
             
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -145,20 +187,110 @@ class TaskViewSet(viewsets.ModelViewSet):
                 'message': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream all matching tasks as NDJSON (default) or CSV"""
+        file_format = request.query_params.get('file_format', 'ndjson')
+        queryset = self.get_queryset()
+
+        if file_format == 'csv':
+            response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="tasks.csv"'
+        elif file_format == 'ndjson':
+            response = StreamingHttpResponse(stream_ndjson(queryset), content_type='application/x-ndjson')
+            response['Content-Disposition'] = 'attachment; filename="tasks.ndjson"'
+        else:
+            return Response({
+                'error': f"Unsupported file_format '{file_format}'",
+                'message': 'Use ndjson or csv'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """Import tasks from an uploaded or raw NDJSON/CSV body"""
+        try:
+            user, created = User.objects.get_or_create(
+                username='default_user',
+                defaults={'email': 'user@example.com'}
+            )
+
+            # Multipart uploads come in as a file, anything else is read
+            # straight off the request body so it is never buffered whole
+            if request.content_type.startswith('multipart/'):
+                upload = request.FILES.get('file')
+                if upload is None:
+                    return Response({
+                        'error': 'No file provided',
+                        'message': "Upload the export under the 'file' field"
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                stream = upload
+                filename = upload.name.lower()
+            else:
+                stream = request.stream
+                filename = ''
+                if stream is None:
+                    return Response({
+                        'error': 'Empty request body'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+            file_format = request.query_params.get('file_format')
+            if not file_format:
+                is_csv = filename.endswith('.csv') or 'csv' in request.content_type
+                file_format = 'csv' if is_csv else 'ndjson'
+
+            lines = iter_text_lines(stream)
+            if file_format == 'csv':
+                records = iter_csv_records(lines)
+            elif file_format == 'ndjson':
+                records = iter_ndjson_records(lines)
+            else:
+                return Response({
+                    'error': f"Unsupported file_format '{file_format}'",
+                    'message': 'Use ndjson or csv'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            result = import_tasks(records, user)
+            return Response({
+                'message': f"Imported {result['created']} tasks",
+                **result
+            })
+        except UnicodeDecodeError as e:
+            return Response({
+                'error': 'Import file must be UTF-8 encoded',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(f"Task import error: {e}")
+            traceback.print_exc()
+            return Response({
+                'error': 'Failed to import tasks',
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @action(detail=True, methods=['patch'])
     def toggle_status(self, request, pk=None):
-        """Toggle task status between pending and completed"""
+        """Toggle task status between pending and completed, or set the given status"""
         try:
-            task = self.get_object()
-            
-            if task.status == 'completed':
-                task.status = 'pending'
-            else:
-                task.status = 'completed'
-            
-            task.save()
-            serializer = self.get_serializer(task)
-            return Response(serializer.data)
+            target = request.data.get('status')
+            if target is not None and target not in dict(Task.STATUS_CHOICES):
+                return Response({
+                    'error': f"Unknown status '{target}'"
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            result = transition_status(int(pk), target) if pk.isdigit() else None
+            if result is None:
+                return Response({
+                    'error': 'Task not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            new_status, updated_at = result
+            return Response({
+                'id': int(pk),
+                'status': new_status,
+                'updated_at': updated_at
+            })
         except Exception as e:
             print(f"Toggle status error: {e}")
             return Response({
@@ -227,22 +359,14 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
             for task_data in result['extracted_tasks']:
                 try:
                     # Find or create category
-                    category_name = task_data['suggested_category']
-                    category, _ = Category.objects.get_or_create(
-                        user=user,
-                        name=category_name.title(),
-                        defaults={
-                            'color': '#6B7280',
-                            'icon': 'folder'
-                        }
-                    )
+                    category_id = resolve_category_id(user, task_data['suggested_category'])
                     
                     # Create task
                     task = Task.objects.create(
                         title=task_data['title'],
                         description=task_data['description'],
                         priority=task_data['priority_score'],
-                        category=category,
+                        category_id=category_id,
                         ai_suggested=True,
                         user=user
                     )
@@ -256,7 +380,10 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
             context_entry.processed = True
             context_entry.save()
             
-            # Serialize created tasks
+            # Serialize created tasks, loading their categories in one query
+            created_tasks = Task.objects.filter(
+                id__in=[task.id for task in created_tasks]
+            ).select_related('category')
             task_serializer = TaskSerializer(created_tasks, many=True)
             
             return Response({